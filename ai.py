@@ -1,9 +1,15 @@
 import os
-import json
+import re
+import time
+import queue
 import logging
+import hashlib
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qsl, urlencode
 from pydantic import BaseModel
 from ollama import chat
-from utils import get_date_time
+from utils import AppData, get_date_time, json_dumps, json_loads
 
 # Configure logging for the AIAgent module
 logger = logging.getLogger("AIAgent")
@@ -22,12 +28,83 @@ class NudgeResponse(BaseModel):
     message: str
 
 
+class BatchCategoryResponse(BaseModel):
+    """Defines the expected format for a batch of app categorizations."""
+
+    results: list[CategoryResponse]
+
+
+# Schemas are immutable per model, so compute them once at import instead of
+# rebuilding the dict on every LLM call.
+_CATEGORY_SCHEMA = CategoryResponse.model_json_schema()
+_NUDGE_SCHEMA = NudgeResponse.model_json_schema()
+_BATCH_CATEGORY_SCHEMA = BatchCategoryResponse.model_json_schema()
+
+# Maps each precomputed schema back to its model for response validation
+_SCHEMA_MODELS = {
+    id(_CATEGORY_SCHEMA): CategoryResponse,
+    id(_NUDGE_SCHEMA): NudgeResponse,
+    id(_BATCH_CATEGORY_SCHEMA): BatchCategoryResponse,
+}
+_MODELS_BY_TITLE = {
+    "CategoryResponse": CategoryResponse,
+    "NudgeResponse": NudgeResponse,
+    "BatchCategoryResponse": BatchCategoryResponse,
+}
+
+# The closed set of categories the model is allowed to return
+VALID_CATEGORIES = frozenset(
+    {"Work", "Gaming", "Browsing", "Communication", "Media", "Other"}
+)
+
+# Deterministic categories for well-known apps, checked before any LLM call
+KNOWN_APPS = {
+    "Visual Studio Code": "Work",
+    "Xcode": "Work",
+    "PyCharm": "Work",
+    "IntelliJ IDEA": "Work",
+    "Terminal": "Work",
+    "iTerm2": "Work",
+    "Steam": "Gaming",
+    "Slack": "Communication",
+    "Discord": "Communication",
+    "Mail": "Communication",
+    "Messages": "Communication",
+    "zoom.us": "Communication",
+    "Spotify": "Media",
+    "Music": "Media",
+    "QuickTime Player": "Media",
+    "Safari": "Browsing",
+    "Google Chrome": "Browsing",
+    "Firefox": "Browsing",
+}
+
+# URL-host patterns for common sites, tried before falling back to the LLM
+HOST_RULES = [
+    (re.compile(r"(youtube|netflix|twitch|vimeo|spotify)\."), "Media"),
+    (re.compile(r"(github|gitlab|bitbucket|stackoverflow|atlassian)\."), "Work"),
+    (re.compile(r"(mail\.google|outlook|slack|discord|web\.whatsapp|telegram)\."), "Communication"),
+    (re.compile(r"(steampowered|steamcommunity|epicgames)\."), "Gaming"),
+]
+
+
 class AIAgent:
     """
     Handles communication with a local AI server for AI tasks.
     It categorizes applications and generates context-aware messages.
     """
 
+    # How many cache misses are sent to the LLM in one batched prompt
+    BATCH_SIZE = 10
+    # Maximum number of entries kept in the in-memory category cache
+    CACHE_MAX_ENTRIES = 10_000
+    # Query-string keys that only carry tracking state, not page identity
+    TRACKING_PARAMS = {"fbclid", "gclid", "ref"}
+    # How long new cache entries may sit in memory before the snapshot is written
+    FLUSH_INTERVAL = 5.0
+    # How long the background worker waits to collect a batch before querying
+    BATCH_WINDOW = 0.2
+
     def __init__(
         self,
         ollama_url="http://localhost:11434",
@@ -38,9 +115,22 @@ class AIAgent:
         self.model_name = model_name
         self.cache_dir = "cache"
         self.filepath = os.path.join(self.cache_dir, filename)
+        # Append-only sidecar log so new entries don't rewrite the whole file
+        self.append_filepath = os.path.splitext(self.filepath)[0] + ".jsonl"
 
         self._ensure_cache_dir()
         self.category_cache = self._load_cache()
+        self._append_file = open(self.append_filepath, "a")
+        self._dirty = False
+        self._flush_timer = None
+
+        # Background worker so LLM calls never block the monitor thread.
+        # Started lazily on the first enqueue: agents that only use the
+        # synchronous path never pay for a polling thread.
+        self._cache_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._worker = None
 
     def _ensure_cache_dir(self):
         """
@@ -52,42 +142,260 @@ class AIAgent:
 
     def _load_cache(self):
         """
-        Loads the application category cache from a local JSON file.
+        Loads the application category cache from the JSON snapshot, then
+        replays any entries appended to the sidecar log since the last flush.
         """
+        cache = OrderedDict()
         if os.path.exists(self.filepath):
             try:
                 with open(self.filepath, "r") as f:
-                    return json.load(f)
-            except json.JSONDecodeError as e:
+                    cache = OrderedDict(json_loads(f.read()))
+            except ValueError as e:
                 logger.error(f"Error loading cache file: {e}")
-                return {}
-        return {}
+        if os.path.exists(self.append_filepath):
+            with open(self.append_filepath, "r") as f:
+                for line in f:
+                    try:
+                        record = json_loads(line)
+                        cache[record["k"]] = record["v"]
+                    except (ValueError, KeyError):
+                        continue
+        return cache
+
+    def _append_cache(self, key: str, value: str):
+        """
+        Appends a single cache entry to the sidecar log. O(1) per insert,
+        instead of rewriting the full snapshot from the monitor thread.
+        """
+        self._append_file.write(json_dumps({"k": key, "v": value}) + "\n")
+        self._append_file.flush()
 
     def _save_cache(self):
         """
-        Saves the current application category cache to a local JSON file.
+        Saves the current application category cache to a local JSON file
+        and truncates the sidecar log now folded into the snapshot.
         """
-        with open(self.filepath, "w") as f:
-            json.dump(self.category_cache, f, indent=4)
+        with self._cache_lock:
+            if not self._dirty:
+                return
+            with open(self.filepath, "w") as f:
+                f.write(json_dumps(dict(self.category_cache), indent=True))
+            self._append_file.truncate(0)
+            self._dirty = False
 
-    def categorize_app(self, app_data: str | dict) -> str:
+    def _schedule_flush(self):
         """
-        Categorizes an application using the LLM.
-        Checks the local cache first before querying the model.
+        Arms a background timer that writes the snapshot after FLUSH_INTERVAL,
+        coalescing a burst of new entries into a single dump.
+        """
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.FLUSH_INTERVAL, self._flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush(self):
+        self._flush_timer = None
+        self._save_cache()
+
+    def _worker_loop(self):
+        """
+        Background thread that drains queued categorization requests. Items
+        arriving within BATCH_WINDOW of each other are grouped and sent to
+        the model as one batched call.
         """
-        cache_key = (
-            app_data
-            if isinstance(app_data, str)
-            else f"chrome|{app_data['active_tab_title']}|{app_data['active_tab_url']}"
+        while not self._stop_event.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+
+            deadline = time.monotonic() + self.BATCH_WINDOW
+            while len(batch) < self.BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                categories = self.categorize_apps_batch(
+                    [app_data for app_data, _ in batch]
+                )
+            except Exception as e:
+                logger.error(f"Worker failed to categorize batch: {e}")
+                categories = ["Other"] * len(batch)
+
+            for (app_data, on_result), category in zip(batch, categories):
+                if on_result is not None:
+                    try:
+                        on_result(app_data, category)
+                    except Exception as e:
+                        logger.error(f"Categorization callback failed: {e}")
+                self._queue.task_done()
+
+    def categorize_app_async(self, app_data: str | AppData, on_result=None):
+        """
+        Queues an app for categorization on the background worker so the
+        caller never blocks on the LLM. On a cache hit the callback fires
+        immediately; otherwise it is invoked from the worker thread once the
+        model has answered.
+        """
+        cached = self._cache_lookup(app_data)
+        if cached is not None:
+            if on_result is not None:
+                on_result(app_data, cached)
+            return
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+            self._worker.start()
+        self._queue.put((app_data, on_result))
+
+    def close(self):
+        """
+        Stops the background worker, if one was started, and writes any
+        pending cache entries.
+        """
+        self._stop_event.set()
+        if self._worker is not None:
+            self._worker.join(timeout=2)
+        self._save_cache()
+
+    def _canonical_url(self, url: str) -> str:
+        """
+        Normalizes a URL so trivially different variants share one cache entry:
+        lower-cases the host, drops the fragment, and strips tracking query
+        parameters (utm_*, fbclid, gclid, ref).
+        """
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return url
+        query = urlencode(
+            [
+                (key, value)
+                for key, value in parse_qsl(parts.query)
+                if not key.startswith("utm_") and key not in self.TRACKING_PARAMS
+            ]
         )
+        canonical = f"{parts.scheme}://{parts.netloc.lower()}{parts.path}"
+        return f"{canonical}?{query}" if query else canonical
+
+    def _cache_keys(self, app_data: str | AppData) -> tuple[str, str | None]:
+        """
+        Builds the cache keys for an app or a Chrome tab entry.
 
-        if cache_key in self.category_cache:
-            return self.category_cache[cache_key]
+        Returns a (primary, secondary) pair: the primary key is the app name
+        or the normalized URL, the secondary key is a hash of the tab title
+        that collapses near-duplicate pages (same article, different URL).
+        """
+        if isinstance(app_data, str):
+            return app_data, None
 
-        if isinstance(app_data, dict):
+        primary = f"chrome|{self._canonical_url(app_data.active_tab_url or '')}"
+        title = app_data.active_tab_title
+        secondary = None
+        if title:
+            title_hash = hashlib.blake2b(
+                title.lower().encode(), digest_size=8
+            ).hexdigest()
+            secondary = f"chrome-title|{title_hash}"
+        return primary, secondary
+
+    def _cache_key(self, app_data: str | AppData) -> str:
+        """
+        Builds the primary cache key for an app or a Chrome tab entry.
+        """
+        return self._cache_keys(app_data)[0]
+
+    def _cache_lookup(self, app_data: str | AppData) -> str | None:
+        """
+        Looks up a cached category by the primary key, falling back to the
+        title-hash key for Chrome entries. Hits are moved to the end of the
+        cache so eviction drops the least recently used entries first.
+        """
+        primary, secondary = self._cache_keys(app_data)
+        with self._cache_lock:
+            for key in (primary, secondary):
+                if key is not None and key in self.category_cache:
+                    self.category_cache.move_to_end(key)
+                    return self.category_cache[key]
+        return None
+
+    def _cache_store(self, app_data: str | AppData, category: str):
+        """
+        Stores a category under both cache keys, evicting the oldest entries
+        once the cache grows past CACHE_MAX_ENTRIES.
+        """
+        primary, secondary = self._cache_keys(app_data)
+        with self._cache_lock:
+            for key in (primary, secondary):
+                if key is not None:
+                    self.category_cache[key] = category
+                    self.category_cache.move_to_end(key)
+                    self._append_cache(key, category)
+            while len(self.category_cache) > self.CACHE_MAX_ENTRIES:
+                self.category_cache.popitem(last=False)
+            self._dirty = True
+
+    def _describe_app(self, app_data: str | AppData) -> str:
+        """
+        Builds a short human-readable description of an app for prompts.
+        """
+        if isinstance(app_data, AppData):
+            return (
+                f"web page with title '{app_data.active_tab_title}' "
+                f"and URL '{app_data.active_tab_url}'"
+            )
+        return f"application '{app_data}'"
+
+    def _fast_categorize(self, app_data: str | AppData) -> str | None:
+        """
+        Deterministic prefilter for obvious cases: well-known app names and
+        recognizable URL hosts are categorized without touching the LLM.
+        Returns None when the app is a genuine unknown.
+        """
+        if isinstance(app_data, str):
+            return KNOWN_APPS.get(app_data)
+        url = app_data.active_tab_url
+        if url:
+            try:
+                netloc = urlsplit(url).netloc.lower()
+            except ValueError:
+                return None
+            for pattern, category in HOST_RULES:
+                if pattern.search(netloc):
+                    return category
+        return None
+
+    def categorize_app(self, app_data: str | AppData) -> str:
+        """
+        Categorizes an application using the LLM.
+        Checks the local cache and the deterministic prefilter first, so
+        only genuine unknowns reach the model.
+        """
+        # An empty Chrome tab (no active tab / browser not running) carries
+        # nothing worth asking the model about
+        if isinstance(app_data, AppData) and not app_data.active_tab_url:
+            return "Other"
+
+        cached = self._cache_lookup(app_data)
+        if cached is not None:
+            return cached
+
+        category = self._fast_categorize(app_data)
+        if category is not None:
+            self._cache_store(app_data, category)
+            self._schedule_flush()
+            return category
+
+        cache_key = self._cache_key(app_data)
+
+        if isinstance(app_data, AppData):
             prompt = (
-                f"Categorize this web page with title '{app_data['active_tab_title']}' "
-                f"and URL '{app_data['active_tab_url']}' into one of the following "
+                f"Categorize this web page with title '{app_data.active_tab_title}' "
+                f"and URL '{app_data.active_tab_url}' into one of the following "
                 "categories: Work, Gaming, Browsing, Communication, Media, or Other. "
                 "Respond with only the category name."
             )
@@ -104,28 +412,83 @@ class AIAgent:
                 f"[AI] Categorizing app: {cache_key}",
             )
             category_response = self._query_llm(
-                prompt=prompt, response_schema=CategoryResponse.model_json_schema()
+                prompt=prompt, response_schema=_CATEGORY_SCHEMA
             )
             category = category_response.category
         except Exception as e:
             logger.error(f"Failed to categorize app with structured response: {e}")
             category = "Other"  # Fallback
 
-        valid_categories = {
-            "Work",
-            "Gaming",
-            "Browsing",
-            "Communication",
-            "Media",
-            "Other",
-        }
-        if category not in valid_categories:
+        if category not in VALID_CATEGORIES:
             category = "Other"
 
-        self.category_cache[cache_key] = category
-        self._save_cache()
+        self._cache_store(app_data, category)
+        self._schedule_flush()
         return category
 
+    def categorize_apps_batch(self, app_data_list: list[str | AppData]) -> list[str]:
+        """
+        Categorizes several applications with a single LLM call.
+        Cache hits are filtered out first; the remaining misses are sent in
+        chunks so many small requests become one structured prompt, and the
+        cache file is written once at the end.
+        """
+        categories = {}
+        misses = []
+        for app_data in app_data_list:
+            cache_key = self._cache_key(app_data)
+            cached = self._cache_lookup(app_data)
+            if cached is None:
+                cached = self._fast_categorize(app_data)
+                if cached is not None:
+                    self._cache_store(app_data, cached)
+            if cached is not None:
+                categories[cache_key] = cached
+            elif cache_key not in categories:
+                misses.append((cache_key, app_data))
+                categories[cache_key] = None
+
+        for start in range(0, len(misses), self.BATCH_SIZE):
+            chunk = misses[start : start + self.BATCH_SIZE]
+            items = "\n".join(
+                f"{i}. {self._describe_app(app_data)}"
+                for i, (_, app_data) in enumerate(chunk, start=1)
+            )
+            prompt = (
+                f"Categorize each of the following {len(chunk)} items into one of "
+                "the following categories: Work, Gaming, Browsing, Communication, "
+                "Media, or Other.\n"
+                f"{items}\n"
+                'Respond with a JSON object {"results": [{"category": ...}, ...]} '
+                f"containing exactly {len(chunk)} entries, one per item, in order."
+            )
+
+            try:
+                print(
+                    get_date_time(),
+                    f"[AI] Categorizing batch of {len(chunk)} apps",
+                )
+                batch_response = self._query_llm(
+                    prompt=prompt,
+                    response_schema=_BATCH_CATEGORY_SCHEMA,
+                )
+                results = batch_response.results
+            except Exception as e:
+                logger.error(f"Failed to categorize batch with structured response: {e}")
+                results = []
+
+            for i, (cache_key, app_data) in enumerate(chunk):
+                category = results[i].category if i < len(results) else "Other"
+                if category not in VALID_CATEGORIES:
+                    category = "Other"
+                categories[cache_key] = category
+                self._cache_store(app_data, category)
+
+        if misses:
+            self._schedule_flush()
+
+        return [categories[self._cache_key(app_data)] for app_data in app_data_list]
+
     def generate_nudge(self, category: str, duration: float) -> str:
         """
         Generates a friendly notification message based on the category and duration.
@@ -143,7 +506,7 @@ class AIAgent:
                 f"[AI] Generating nudge for category: {category}, duration: {duration} seconds",
             )
             nudge_response = self._query_llm(
-                prompt=prompt, response_schema=NudgeResponse.model_json_schema()
+                prompt=prompt, response_schema=_NUDGE_SCHEMA
             )
             return nudge_response.message
         except Exception as e:
@@ -162,11 +525,15 @@ class AIAgent:
             )
             json_response = response["message"]["content"]
             print(get_date_time(), "[AI] Received response. Notifying user...")
-            # Use the Pydantic model's validation method to parse the JSON
-            if response_schema["title"] == "CategoryResponse":
-                return CategoryResponse.model_validate_json(json_response)
-            else:
-                return NudgeResponse.model_validate_json(json_response)
+            # Use the Pydantic model's validation method to parse the JSON.
+            # The precomputed schemas map back to their model by identity;
+            # ad-hoc schemas fall back to a title lookup.
+            model_cls = _SCHEMA_MODELS.get(id(response_schema))
+            if model_cls is None:
+                model_cls = _MODELS_BY_TITLE[response_schema["title"]]
+            # Decode with the fast JSON helper and skip Pydantic's own
+            # string-parsing path
+            return model_cls.model_validate(json_loads(json_response))
 
         except Exception as e:
             logger.error(f"Error querying Ollama: {e}")
@@ -0,0 +1,56 @@
+import os
+import sqlite3
+import threading
+
+
+class CategoryStore:
+    """
+    Durable key → category store backed by SQLite, so categorizations
+    survive restarts: apps and tabs seen yesterday never go back to the
+    LLM. Lives next to the AI agent's cache files in the 'cache' dir.
+    """
+
+    def __init__(self, filename="category_cache.db"):
+        self.cache_dir = "cache"
+        self.filepath = os.path.join(self.cache_dir, filename)
+
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+        # The poll loop calls in from worker-pool threads, so the single
+        # connection is shared behind a lock instead of per-thread handles
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.filepath, check_same_thread=False)
+        # WAL keeps writers from blocking readers; NORMAL trades a little
+        # crash durability for not fsyncing on every insert
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, category TEXT)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        """
+        Returns the stored category for a key, or None on a miss.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT category FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, category: str):
+        """
+        Stores or overwrites the category for a key.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, category) VALUES (?, ?)",
+                (key, category),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
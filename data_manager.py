@@ -1,19 +1,61 @@
-import json
 import os
 import datetime
 
+from utils import json_dumps, json_loads
+
+# NumPy + Numba are optional: daily logs are small today, but when they are
+# installed the reporting path reduces at C speed instead of per-row Python.
+try:
+    import numpy as np
+    from numba import njit
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+
+    @njit(cache=True)
+    def _sum_by_category(cat_ids, durations, n_categories):
+        totals = np.zeros(n_categories, dtype=np.float64)
+        for i in range(cat_ids.shape[0]):
+            totals[cat_ids[i]] += durations[i]
+        return totals
+
 
 class DataManager:
     """
-    Manages data persistence using a local JSON file, stored in a 'logs' directory.
+    Manages data persistence using a local newline-delimited JSON file,
+    stored in a 'logs' directory. Each session is appended as one line, so
+    a save never rewrites the existing history.
     """
 
-    def __init__(self, filename="2025-08-20.json"):
+    def __init__(self, filename="2025-08-20.ndjson"):
         self.log_dir = "logs"
         self.filepath = os.path.join(self.log_dir, filename)
 
         self._ensure_log_dir()
         self.data = self._load_data()
+        # Running index so queries don't rescan the whole session history
+        self._latest_by_category = self._build_latest_index()
+        # One handle held open for the process lifetime: saves are buffered
+        # writes on it instead of an open/close syscall pair per session,
+        # with one flush per save so a crash never loses completed sessions.
+        self._fh = open(self.filepath, "a")
+
+    def _build_latest_index(self) -> dict:
+        """
+        Builds the per-category latest-session index from loaded data.
+        """
+        latest = {}
+        for entry in self.data:
+            category = entry.get("category")
+            latest[category] = {
+                "duration_seconds": entry.get("duration_seconds", 0),
+                "start_time": entry.get("start_time"),
+            }
+        return latest
 
     def _ensure_log_dir(self):
         if not os.path.exists(self.log_dir):
@@ -22,16 +64,53 @@ class DataManager:
 
     def _load_data(self):
         if os.path.exists(self.filepath):
-            try:
-                with open(self.filepath, "r") as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return []
+            entries = []
+            with open(self.filepath, "r") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entries.append(json_loads(line))
+                    except ValueError:
+                        # A torn final line (e.g. after a crash) is dropped
+                        continue
+            return entries
         return []
 
-    def _save_data(self):
+    def _append(self, entry: dict):
+        """
+        Appends a single session entry as one NDJSON line — O(1) per save,
+        independent of how much history the file already holds. The line
+        lands in the handle's buffer; flush() or close() pushes it to disk.
+        """
+        self._fh.write(json_dumps(entry) + "\n")
+
+    def flush(self):
+        """
+        Drains buffered session lines to disk.
+        """
+        self._fh.flush()
+
+    def close(self):
+        """
+        Flushes and closes the log handle. Call on shutdown; _load_data's
+        torn-line skip covers anything lost to a hard crash before then.
+        """
+        if not self._fh.closed:
+            self._fh.close()
+
+    def compact(self):
+        """
+        Rewrites the log file from the in-memory data in one pass, dropping
+        any malformed lines. Intended to run occasionally (e.g. daily), not
+        on the save path.
+        """
+        self._fh.close()
         with open(self.filepath, "w") as f:
-            json.dump(self.data, f, indent=4)
+            for entry in self.data:
+                f.write(json_dumps(entry) + "\n")
+        self._fh = open(self.filepath, "a")
 
     def save_session(
         self,
@@ -57,7 +136,14 @@ class DataManager:
             "duration_seconds": (end_time - start_time).total_seconds(),
         }
         self.data.append(entry)
-        self._save_data()
+        self._latest_by_category[category] = {
+            "duration_seconds": entry["duration_seconds"],
+            "start_time": entry["start_time"],
+        }
+        self._append(entry)
+        # Still O(1) per save: the line is already in the buffer, this
+        # just pushes it to the OS so an abnormal exit can't lose it
+        self.flush()
     
     # This method is no longer used by the main loop for real-time checks,
     # but it is kept for potential future use cases like data analysis or reports.
@@ -68,25 +154,54 @@ class DataManager:
         Returns:
             A dictionary mapping each category to its latest session.
         """
-        latest_sessions = {}
-        for entry in reversed(self.data):
+        # The index is maintained incrementally by save_session, so this is
+        # O(categories) instead of a reverse scan of the whole history.
+        return dict(self._latest_by_category)
+
+    def get_aggregated_data(self) -> dict:
+        """
+        Sums the total duration per category across the loaded history.
+
+        Returns:
+            A dictionary mapping each category to its total duration in seconds.
+        """
+        # Map categories to small integer ids so the reduction can run over
+        # flat numeric arrays.
+        categories = []
+        category_index = {}
+        cat_ids = []
+        durations = []
+        for entry in self.data:
             category = entry.get("category")
-            if category not in latest_sessions:
-                latest_sessions[category] = {
-                    "duration_seconds": entry.get("duration_seconds", 0),
-                    "start_time": entry.get("start_time"),
-                }
-        return latest_sessions
+            idx = category_index.setdefault(category, len(categories))
+            if idx == len(categories):
+                categories.append(category)
+            cat_ids.append(idx)
+            durations.append(entry.get("duration_seconds", 0))
+
+        if HAS_NUMBA and cat_ids:
+            totals = _sum_by_category(
+                np.asarray(cat_ids, dtype=np.int64),
+                np.asarray(durations, dtype=np.float64),
+                len(categories),
+            )
+            return {categories[i]: float(totals[i]) for i in range(len(categories))}
+
+        aggregated = {}
+        for idx, duration in zip(cat_ids, durations):
+            aggregated[categories[idx]] = aggregated.get(categories[idx], 0.0) + duration
+        return aggregated
 
 if __name__ == "__main__":
     dm = DataManager()
 
     print("Saving example entries...")
-    dm.save_entry("Visual Studio Code", "Work", 3600)
-    dm.save_entry("Steam", "Gaming", 1800)
-    dm.save_entry("Google Chrome", "Browsing", 7200)
+    now = datetime.datetime.now()
+    dm.save_session("Visual Studio Code", "Work", now, now + datetime.timedelta(seconds=3600))
+    dm.save_session("Steam", "Gaming", now, now + datetime.timedelta(seconds=1800))
+    dm.save_session("Google Chrome", "Browsing", now, now + datetime.timedelta(seconds=7200))
 
     print("\nAggregated data:")
     aggregated_data = dm.get_aggregated_data()
     for category, duration in aggregated_data.items():
-        print(f"Category: {category}, Duration: {duration:.2f} minutes")
+        print(f"Category: {category}, Duration: {duration / 60:.2f} minutes")
@@ -1,7 +1,43 @@
 import subprocess
 import psutil
 import os
-import json
+import time
+import plistlib
+
+from utils import AppData
+
+# Force the C locale so spawned helpers skip locale setup
+_SUBPROCESS_ENV = {**os.environ, "LC_ALL": "C"}
+
+# PyObjC is optional: when present, focus changes can be delivered as
+# NSWorkspace notifications instead of being polled.
+try:
+    from AppKit import NSWorkspace
+    from Foundation import NSObject
+
+    HAS_APPKIT = True
+except ImportError:
+    HAS_APPKIT = False
+
+
+if HAS_APPKIT:
+
+    class _ActivationObserver(NSObject):
+        """
+        Receives NSWorkspaceDidActivateApplicationNotification and forwards
+        the activated app's name to a Python callback.
+        """
+
+        def initWithCallback_(self, callback):
+            self = super().init()
+            if self is None:
+                return None
+            self._callback = callback
+            return self
+
+        def applicationActivated_(self, notification):
+            app = notification.userInfo()["NSWorkspaceApplicationKey"]
+            self._callback(str(app.localizedName()))
 
 
 class MacOSMonitor:
@@ -10,9 +46,155 @@ class MacOSMonitor:
     detailed application and browser activity.
     """
 
+    # TTLs for the AppleScript result caches: repeated polls within the TTL
+    # reuse the last answer instead of forking a new osascript process.
+    CHROME_TTL = 1.5
+    PID_TTL = 0.5
+
     def __init__(self):
         # Cache for app bundle info to avoid repeated file system calls
         self._bundle_cache = {}
+        # Parsed Info.plist data keyed by path, invalidated on mtime change
+        self._plist_cache = {}
+        # Resolved process names keyed by (pid, create_time); create_time
+        # disambiguates PID reuse
+        self._pid_name_cache = {}
+        # (monotonic timestamp, value) pairs for the TTL caches
+        self._chrome_cache = (0.0, None)
+        self._pid_cache = (0.0, None)
+        self._last_pid = None
+        # Long-lived interactive osascript process, spawned on first use
+        self._osa = None
+        # NSWorkspace activation observer, registered on demand
+        self._activation_observer = None
+
+    def start_activation_observer(self, callback) -> bool:
+        """
+        Subscribes to NSWorkspace app-activation notifications so `callback`
+        fires only on actual focus changes, instead of the caller polling
+        every second. Requires a running event loop (e.g.
+        PyObjCTools.AppHelper.runConsoleEventLoop). Returns False when
+        PyObjC is not available.
+        """
+        if not HAS_APPKIT:
+            return False
+        if self._activation_observer is None:
+            self._activation_observer = _ActivationObserver.alloc().initWithCallback_(
+                callback
+            )
+            NSWorkspace.sharedWorkspace().notificationCenter().addObserver_selector_name_object_(
+                self._activation_observer,
+                b"applicationActivated:",
+                "NSWorkspaceDidActivateApplicationNotification",
+                None,
+            )
+        return True
+
+    def stop_activation_observer(self):
+        """
+        Unregisters the activation observer, if one was started.
+        """
+        if self._activation_observer is not None:
+            NSWorkspace.sharedWorkspace().notificationCenter().removeObserver_(
+                self._activation_observer
+            )
+            self._activation_observer = None
+
+    # Sentinel emitted after each script so we know where its output ends
+    _OSA_SENTINEL = "<<END>>"
+
+    def _ensure_osa(self):
+        """
+        Returns the long-lived `osascript -i` process, (re)spawning it if it
+        has never been started or has died. Returns None when osascript
+        cannot be spawned at all.
+        """
+        if self._osa is None or self._osa.poll() is not None:
+            try:
+                self._osa = subprocess.Popen(
+                    ["osascript", "-i"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    bufsize=1,
+                )
+            except OSError:
+                self._osa = None
+        return self._osa
+
+    def _osa_run(self, script: str) -> str:
+        """
+        Runs an AppleScript snippet, avoiding a fork/exec + script compile
+        per call where possible. `osascript -i` compiles and executes each
+        stdin line independently, so only single-line scripts go through
+        the persistent helper; multi-line scripts, an unavailable helper,
+        or an empty/unusable reply all fall back to a one-shot
+        `osascript -e`.
+        """
+        script = script.strip()
+        if "\n" not in script:
+            proc = self._ensure_osa()
+            if proc is not None:
+                try:
+                    proc.stdin.write(f'{script}\n"{self._OSA_SENTINEL}"\n')
+                    proc.stdin.flush()
+                    lines = []
+                    for line in proc.stdout:
+                        line = line.rstrip("\n")
+                        # Interactive mode frames replies with prompt and
+                        # echo markers; strip any leading run of them
+                        while line[:3] in (">> ", "=> "):
+                            line = line[3:]
+                        if self._OSA_SENTINEL in line:
+                            result = "\n".join(lines).strip().strip('"')
+                            if result:
+                                return result
+                            # Empty reply: the line errored (stderr is
+                            # discarded) — retry via the one-shot path
+                            break
+                        if line:
+                            lines.append(line)
+                    else:
+                        # EOF means the helper died mid-script
+                        self._osa = None
+                except (BrokenPipeError, OSError):
+                    self._osa = None
+
+        # One-shot fallback: bytes out, stderr discarded, no locale-aware
+        # decode — we decode once ourselves
+        result = subprocess.run(
+            ["osascript", "-e", script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=False,
+            env=_SUBPROCESS_ENV,
+        )
+        return result.stdout.decode("utf-8", "replace").strip()
+
+    def _resolve_process_name(self, process) -> str:
+        """
+        Returns the display name for a process, resolving Electron apps to
+        their real app name. Results are cached by (pid, create_time) so
+        repeated polls of the same process are a single dict hit; the
+        create_time component guards against PID reuse.
+        """
+        cache_key = (process.pid, process.create_time())
+        cached = self._pid_name_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        process_name = process.name()
+        # If it's an Electron app, get the real name
+        if process_name in ["Electron", "electron"]:
+            real_name = self._get_real_app_name(process)
+            process_name = real_name if real_name else process_name
+
+        # Dead processes are never evicted individually, so bound the cache
+        if len(self._pid_name_cache) > 1024:
+            self._pid_name_cache.clear()
+        self._pid_name_cache[cache_key] = process_name
+        return process_name
 
     def get_active_window(self) -> str:
         """
@@ -23,15 +205,7 @@ class MacOSMonitor:
         try:
             active_window_pid = self._get_active_window_pid()
             if active_window_pid:
-                process = psutil.Process(active_window_pid)
-                process_name = process.name()
-
-                # If it's an Electron app, get the real name
-                if process_name in ["Electron", "electron"]:
-                    real_name = self._get_real_app_name(process)
-                    return real_name if real_name else process_name
-
-                return process_name
+                return self._resolve_process_name(psutil.Process(active_window_pid))
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             return None
         return None
@@ -39,16 +213,27 @@ class MacOSMonitor:
     def _get_active_window_pid(self) -> int:
         """
         Helper function to find the PID of the active window on macOS.
+        Results are cached for a short TTL to avoid spawning osascript
+        on every poll of the 1 s monitor loop.
         """
+        now = time.monotonic()
+        cached_at, cached_pid = self._pid_cache
+        if cached_pid is not None and now - cached_at < self.PID_TTL:
+            return cached_pid
+
         applescript = 'tell application "System Events" to get unix id of first process whose frontmost is true'
         try:
-            result = subprocess.run(
-                ["osascript", "-e", applescript], capture_output=True, text=True
-            )
-            return int(result.stdout.strip())
+            pid = int(self._osa_run(applescript))
         except (subprocess.CalledProcessError, ValueError):
             return None
 
+        self._pid_cache = (now, pid)
+        # A focus change invalidates the cached Chrome tab info
+        if pid != self._last_pid:
+            self._chrome_cache = (0.0, None)
+            self._last_pid = pid
+        return pid
+
     def _get_real_app_name(self, process):
         """
         Get the real app name from an Electron process by checking its app bundle.
@@ -99,21 +284,24 @@ class MacOSMonitor:
             return None
 
         try:
-            # Use plutil to convert plist to JSON
-            result = subprocess.run(
-                ["plutil", "-convert", "json", "-o", "-", info_plist_path],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            plist_data = json.loads(result.stdout)
+            # Reuse the parsed plist unless the bundle changed on disk
+            mtime = os.path.getmtime(info_plist_path)
+            cached = self._plist_cache.get(info_plist_path)
+            if cached and cached[0] == mtime:
+                return cached[1]
 
-            return {
+            # Parse the plist natively instead of shelling out to plutil
+            with open(info_plist_path, "rb") as f:
+                plist_data = plistlib.load(f)
+
+            info = {
                 "bundle_name": plist_data.get("CFBundleName", ""),
                 "display_name": plist_data.get("CFBundleDisplayName", ""),
                 "bundle_id": plist_data.get("CFBundleIdentifier", ""),
                 "executable": plist_data.get("CFBundleExecutable", ""),
             }
+            self._plist_cache[info_plist_path] = (mtime, info)
+            return info
         except:
             return None
 
@@ -121,25 +309,48 @@ class MacOSMonitor:
         """Get all running Electron apps with their real names"""
         electron_apps = []
 
-        for proc in psutil.process_iter(["pid", "name", "exe"]):
-            try:
-                proc_info = proc.info
-
-                # Check if it's an Electron app
-                if proc_info["name"] in ["Electron", "electron"]:
-                    real_name = self._get_real_app_name(proc)
-
-                    electron_apps.append(
-                        {
-                            "pid": proc_info["pid"],
-                            "process_name": proc_info["name"],
-                            "real_name": real_name,
-                            "exe_path": proc_info["exe"],
-                        }
-                    )
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        # First pass: collect the Electron processes and group them by app
+        # bundle, so ten helper processes sharing one bundle cost one plist
+        # parse instead of ten.
+        by_bundle = {}
+        for proc in psutil.process_iter(attrs=["pid", "name", "exe"], ad_value=None):
+            proc_info = proc.info
+
+            # Check if it's an Electron app
+            if proc_info["name"] not in ["Electron", "electron"]:
                 continue
 
+            exe_path = proc_info["exe"]
+            bundle_path = None
+            if exe_path and ".app/" in exe_path:
+                bundle_path = exe_path.split(".app/")[0] + ".app"
+            by_bundle.setdefault(bundle_path, []).append(proc_info)
+
+        # Second pass: resolve each unique bundle once, then emit one row
+        # per process.
+        for bundle_path, proc_infos in by_bundle.items():
+            real_name = None
+            if bundle_path is not None:
+                real_name = self._bundle_cache.get(bundle_path)
+                if real_name is None:
+                    bundle_info = self._get_app_bundle_info(bundle_path)
+                    if bundle_info:
+                        real_name = bundle_info.get("display_name") or bundle_info.get(
+                            "bundle_name"
+                        )
+                    if real_name:
+                        self._bundle_cache[bundle_path] = real_name
+
+            for proc_info in proc_infos:
+                electron_apps.append(
+                    {
+                        "pid": proc_info["pid"],
+                        "process_name": proc_info["name"],
+                        "real_name": real_name or proc_info["name"],
+                        "exe_path": proc_info["exe"],
+                    }
+                )
+
         return electron_apps
 
     def get_app_name_by_pid(self, pid: int) -> str:
@@ -148,22 +359,22 @@ class MacOSMonitor:
         Useful for getting proper names for Electron apps.
         """
         try:
-            process = psutil.Process(pid)
-            process_name = process.name()
-
-            if process_name in ["Electron", "electron"]:
-                real_name = self._get_real_app_name(process)
-                return real_name if real_name else process_name
-
-            return process_name
+            return self._resolve_process_name(psutil.Process(pid))
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             return None
 
-    def get_chrome_activity(self) -> dict:
+    def get_chrome_activity(self) -> AppData:
         """
         Executes AppleScript to get the title and URL of the active Chrome tab.
-        Returns a dictionary with window name, active tab title, and active tab URL.
+        Returns an AppData snapshot with window name, active tab title, and
+        active tab URL. The result is cached for a short TTL so staying on the
+        same tab does not fork an osascript subprocess every tick.
         """
+        now = time.monotonic()
+        cached_at, cached_activity = self._chrome_cache
+        if cached_activity is not None and now - cached_at < self.CHROME_TTL:
+            return cached_activity
+
         applescript = """
         tell application "Google Chrome"
             if running then
@@ -182,21 +393,26 @@ class MacOSMonitor:
         end tell
         """
 
-        result = subprocess.run(
-            ["osascript", "-e", applescript], capture_output=True, text=True
-        )
-        raw_output = result.stdout.strip()
+        raw_output = self._osa_run(applescript)
 
         # Split the AppleScript return into parts
         parts = raw_output.split("|||")
         tab_title = parts[0] if len(parts) > 0 else None
         tab_url = parts[1] if len(parts) > 1 else None
 
-        return {
-            "window_name": "Google Chrome",
-            "active_tab_title": tab_title,
-            "active_tab_url": tab_url,
-        }
+        # The degenerate states ("No active tab", "Not running") carry no
+        # tab information at all
+        if tab_title in ("No active tab", "Not running") or not tab_url:
+            tab_title = None
+            tab_url = None
+
+        activity = AppData(
+            window_name="Google Chrome",
+            active_tab_title=tab_title,
+            active_tab_url=tab_url,
+        )
+        self._chrome_cache = (now, activity)
+        return activity
 
     # def get_all_chrome_tabs(self) -> dict:
     #     """
@@ -42,20 +42,48 @@ class Monitor:
         # If the active app is Chrome on macOS, we can get more detailed info
         if platform.system() == "Darwin" and active_app == "Google Chrome":
             chrome_activity = self._platform_monitor.get_chrome_activity()
+            # Without an active tab there is nothing to categorize beyond the
+            # browser itself, so reuse the plain app-name path and its cache
+            if not chrome_activity.active_tab_url:
+                return active_app
             return chrome_activity
         return active_app
 
+    def start_event_listener(self, callback) -> bool:
+        """
+        Subscribes to focus-change events on platforms that support them
+        (macOS via NSWorkspace notifications), so `callback` fires only when
+        the active app actually changes. Returns False when event delivery
+        is unavailable and the caller should fall back to polling.
+        """
+        starter = getattr(self._platform_monitor, "start_activation_observer", None)
+        if starter is None:
+            return False
+        return starter(callback)
+
 
 # For testing purposes
 if __name__ == "__main__":
     monitor = Monitor()
-    print("Monitoring active windows. Press Ctrl+C to exit.")
 
-    last_app = None
-    while True:
-        current_app = monitor.get_active_window()
-        if current_app and current_app != last_app:
-            print(f"Active app changed to: {current_app}")
-            last_app = current_app
+    def on_activation(app_name):
+        print(f"Active app changed to: {app_name}")
+
+    if monitor.start_event_listener(on_activation):
+        # Event-driven path: near-zero idle CPU, fires only on focus changes
+        print("Listening for activation events. Press Ctrl+C to exit.")
+        from PyObjCTools import AppHelper
+
+        AppHelper.runConsoleEventLoop(installInterrupt=True)
+    else:
+        # Polling fallback for Windows/Generic platforms
+        print("Monitoring active windows. Press Ctrl+C to exit.")
+
+        last_app = None
+        while True:
+            current_app = monitor.get_active_window()
+            if current_app and current_app != last_app:
+                print(f"Active app changed to: {current_app}")
+                last_app = current_app
 
-        time.sleep(1)
+            time.sleep(1)
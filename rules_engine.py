@@ -1,8 +1,37 @@
 import os
 import time
-import json
 from pathlib import Path
 
+from utils import json_dumps, json_loads
+
+# NumPy + Numba are optional, as in data_manager: with them installed the
+# threshold scan compiles to native code (cache=True keeps the compiled
+# artifact across starts); without them the same loop runs as plain Python.
+try:
+    import numpy as np
+    from numba import njit
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+def _first_crossed(thresholds, duration):
+    """
+    Returns the index of the first threshold the duration has crossed, or
+    -1. Thresholds are sorted longest-first, so every later entry is
+    crossed too once one matches.
+    """
+    for i in range(len(thresholds)):
+        if duration >= thresholds[i]:
+            return i
+    return -1
+
+
+if HAS_NUMBA:
+    _first_crossed = njit(cache=True)(_first_crossed)
+
+
 DEFAULT_RULES = [
     ("Work", 30, "short_work_session"),
     ("Gaming", 20, "short_gaming_session"),
@@ -20,30 +49,88 @@ class RulesEngine:
         self.config_file = Path(__file__).parent / config_file
         # Tracks the last time a nudge was sent for a specific action
         self.last_nudged_time = {}
-        self.last_modified_time = os.path.getmtime(self.config_file) if self.config_file.exists() else 0
+        self.last_modified_time = 0
+        self.rules = None
+        # Rules grouped by category, longest duration first, for fast lookup
+        self._rules_by_category = {}
+        # Categories that have at least one rule, for an O(1) early exit
+        self._categories_with_rules = frozenset()
         self.rules = self.load_rules()
 
+    def _group_rules(self, rules):
+        """
+        Groups rules by category as {category: (thresholds, actions)} with
+        the longest durations first, so evaluation only scans the rules
+        that can apply to the current session. Thresholds are kept in a
+        flat numeric array so the scan kernel works on float64 values.
+        """
+        grouped = {}
+        for category, duration_seconds, action_name in rules:
+            grouped.setdefault(category, []).append((duration_seconds, action_name))
+        compiled = {}
+        for category, entries in grouped.items():
+            entries.sort(reverse=True)
+            thresholds = [float(duration) for duration, _ in entries]
+            if HAS_NUMBA:
+                thresholds = np.asarray(thresholds, dtype=np.float64)
+            actions = tuple(action for _, action in entries)
+            compiled[category] = (thresholds, actions)
+        return compiled
+
     def load_rules(self):
         """
-        Load rules from the JSON configuration file and check for modifications.
+        Load rules from the JSON configuration file, reparsing only when the
+        file's mtime has actually advanced since the last load.
         Returns a list of tuples: (category, duration_seconds, action_name)
         """
         try:
             current_modified_time = os.path.getmtime(self.config_file)
-            if current_modified_time > self.last_modified_time:
+            if self.rules is not None and current_modified_time == self.last_modified_time:
+                return self.rules
+
+            if self.rules is not None:
                 print(f"Rules configuration file {self.config_file} has been modified! Reloading...")
-                self.last_modified_time = current_modified_time
-            
+            self.last_modified_time = current_modified_time
+
             with open(self.config_file, "r") as f:
-                config = json.load(f)
-                return [(rule["category"], rule["duration_seconds"], rule["action_name"]) 
-                       for rule in config["rules"]]
+                config = json_loads(f.read())
+                rules = [(rule["category"], rule["duration_seconds"], rule["action_name"])
+                        for rule in config["rules"]]
         except FileNotFoundError:
             print(f"Warning: Rules configuration file {self.config_file} not found. Using default rules.")
-            return DEFAULT_RULES
-        except json.JSONDecodeError:
+            rules = DEFAULT_RULES
+        except ValueError:
             print(f"Warning: Invalid JSON in {self.config_file}. Using default rules.")
-            return DEFAULT_RULES
+            rules = DEFAULT_RULES
+
+        # Freeze the parsed rules: the tuple is shared until the next reload
+        rules = tuple(rules)
+        try:
+            grouped = self._group_rules(rules)
+        except (TypeError, ValueError):
+            # Valid JSON but malformed values (e.g. a non-numeric
+            # duration) must not escape into the main loop
+            print(f"Warning: Invalid rule values in {self.config_file}. Using default rules.")
+            rules = tuple(DEFAULT_RULES)
+            grouped = self._group_rules(rules)
+        self._rules_by_category = grouped
+        self._categories_with_rules = frozenset(grouped)
+        return rules
+
+    def next_trigger_for(self, category: str) -> float | None:
+        """
+        Returns the smallest duration threshold among the rules for a
+        category, or None when no rule applies. Callers can turn this into
+        a deadline at session start and skip evaluation entirely until the
+        session has run long enough to possibly trigger anything.
+        """
+        self.rules = self.load_rules()
+        entry = self._rules_by_category.get(category)
+        if entry is None:
+            return None
+        thresholds, _ = entry
+        # Thresholds are sorted longest-first, so the last one is the minimum
+        return float(thresholds[-1])
 
     def evaluate_current_session(self, category: str, duration: float) -> tuple | None:
         """
@@ -56,14 +143,23 @@ class RulesEngine:
         Returns:
             A tuple for the triggered rule: (rule_name, category, duration) or None.
         """
-        # Reload rules on every check to detect changes
+        # Reload rules on every check to detect changes (no-op unless mtime advanced)
         self.rules = self.load_rules()
-        for rule_category, rule_duration, action in self.rules:
-            if rule_category == category and duration >= rule_duration:
-                # Check if a nudge for this action has been sent recently
-                if (action not in self.last_nudged_time) or (time.time() - self.last_nudged_time[action] > rule_duration):
-                    self.last_nudged_time[action] = time.time()
-                    return (action, category, int(duration))
+        if category not in self._categories_with_rules:
+            return None
+        thresholds, actions = self._rules_by_category[category]
+        # The numeric scan finds the first crossed threshold; everything
+        # after it is crossed too since thresholds descend
+        first = _first_crossed(thresholds, duration)
+        if first < 0:
+            return None
+        now = time.time()
+        for i in range(first, len(actions)):
+            action = actions[i]
+            # Check if a nudge for this action has been sent recently
+            if now - self.last_nudged_time.get(action, 0.0) > thresholds[i]:
+                self.last_nudged_time[action] = now
+                return (action, category, int(duration))
         return None
 
     def reset_rules(self):
@@ -71,7 +167,8 @@ class RulesEngine:
         Resets the state of last nudged actions.
         This could be used for a daily reset or after a long break.
         """
-        self.last_nudged_time.clear()
+        # Rebinding is a faster bulk reset than clearing in place
+        self.last_nudged_time = {}
 
 # For testing purposes
 if __name__ == "__main__":
@@ -80,7 +177,7 @@ if __name__ == "__main__":
     # Create a dummy config file for testing
     dummy_config = {"rules": [{"category": "Work", "duration_seconds": 5, "action_name": "short_work_session"}]}
     with open("test_rules_config.json", "w") as f:
-        json.dump(dummy_config, f)
+        f.write(json_dumps(dummy_config))
     
     print("Testing continuous session evaluation.")
     
@@ -2,14 +2,98 @@ import time
 import datetime
 import os
 import sys
+import asyncio
 import argparse
+import io
+import logging
+import logging.handlers
+import queue
+from dataclasses import dataclass
 
+from category_store import CategoryStore
 from data_manager import DataManager
 from monitor import Monitor
 from rules_engine import RulesEngine
 from notifier import Notifier
-from ai import AIAgent
-from utils import get_date, get_date_time
+from utils import VERBOSE, AppData, get_date
+
+# Hot-path log lines go through a queue drained by a background listener
+# thread (started in __main__), so the poll loop never blocks on a stdout
+# flush — logger calls are a lock-free enqueue.
+logger = logging.getLogger("bilge")
+
+
+class _BufferedStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler that rate-limits flushes, which only helps when its
+    stream buffers writes — sys.stderr is write-through since 3.9, so
+    the listener hands it a block-buffered wrapper. Records accumulate
+    in that buffer and are flushed at most once per FLUSH_INTERVAL,
+    one write syscall per burst instead of per line; close() always
+    drains.
+    """
+
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_flush = 0.0
+
+    def flush(self):
+        now = time.monotonic()
+        if now - self._last_flush >= self.FLUSH_INTERVAL:
+            self._last_flush = now
+            super().flush()
+
+    def close(self):
+        # Bypass the rate limit so nothing buffered is lost on shutdown
+        super().flush()
+        super().close()
+
+
+def start_log_listener() -> logging.handlers.QueueListener:
+    """
+    Wires the module logger to a QueueHandler and starts the listener
+    thread that writes records to stderr. Returns the listener so the
+    caller can stop() it on exit to drain pending records.
+    """
+    log_queue = queue.Queue(-1)
+    # sys.stderr writes through to the OS on every call, defeating the
+    # handler's rate-limited flush — wrap its raw buffer in a
+    # block-buffered writer the handler owns instead
+    buffer = getattr(sys.stderr, "buffer", None)
+    if buffer is not None:
+        stream = io.TextIOWrapper(buffer, line_buffering=False, write_through=False)
+    else:
+        stream = sys.stderr
+    handler = _BufferedStreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s", "%Y-%m-%d %H:%M:%S"))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    listener.start()
+    return listener
+
+
+@dataclass(slots=True)
+class Session:
+    """
+    All state belonging to one tracked session. Bundling it means a
+    session switch is a single attribute swap — old out, new in — instead
+    of five separate assignments scattered through the loop body.
+    """
+
+    app_name: str | None
+    category: str | None
+    start_time: datetime.datetime
+    start_mono: float
+    # The raw monitor snapshot, for the unchanged-window fast path
+    app_data: str | AppData | None = None
+    # Whether a nudge has already fired for this session
+    nudged: bool = False
+    # Monotonic deadline before which no rule can possibly trigger;
+    # None means the category has no rules at all
+    rule_deadline: float | None = None
 
 
 class BilgeApp:
@@ -19,125 +103,280 @@ class BilgeApp:
     """
 
     TEN_SECONDS = 10
+    # Adaptive polling: back off while the window is unchanged, snap back on a switch
+    MIN_POLL_INTERVAL = 1.0
+    MAX_POLL_INTERVAL = 10.0
+    POLL_BACKOFF = 1.5
+    # How long a monitor result may be reused before re-querying the platform
+    MONITOR_TTL = 3.0
 
     def __init__(self, date: str, model_name: str | None = None):
-        self.data_manager = DataManager(filename=f"{date}.json")
+        # Imported here so plain startup work (arg parsing, the model
+        # availability check, --help) never pays the Ollama/Pydantic
+        # import cost
+        from ai import AIAgent
+
+        self.data_manager = DataManager(filename=f"{date}.ndjson")
         self.monitor = Monitor()
         self.rules_engine = RulesEngine()
         self.notifier = Notifier()
         self.ai_agent = AIAgent(model_name=model_name)
+        # Durable category cache shared across runs
+        self.category_store = CategoryStore()
 
-        # State variables for the current session
-        self.current_session_start_time = datetime.datetime.now()
-        self.current_session_category = None
-        self.current_session_app_name = None
-        self.last_app_data = None
-        # State variable for managing in-session nudges
-        self.nudged_for_session = False
-
-    def _get_app_info(self, app_data):
-        if isinstance(app_data, dict):
-            categorization_string = (
-                f"{app_data['active_tab_title']} | {app_data['active_tab_url']}"
-            )
-            app_name_for_log = (
-                f"{app_data['window_name']} | {app_data['active_tab_title']}"
+        # The current session's state as one bundle. start_mono is the
+        # monotonic twin of start_time: duration math is a float
+        # subtraction and immune to wallclock jumps (NTP, DST)
+        self.session = Session(
+            app_name=None,
+            category=None,
+            start_time=datetime.datetime.now(),
+            start_mono=time.monotonic(),
+        )
+        # Exact-match memo of categorization results, so repeat ticks on the
+        # same window never leave this process
+        self._category_memo = {}
+        # Current polling interval, grown while nothing changes
+        self._poll_interval = self.MIN_POLL_INTERVAL
+        # Strong references to in-flight nudge tasks: the event loop only
+        # holds tasks weakly, so an unreferenced task can be collected
+        # mid-execution and silently drop its nudge
+        self._nudge_tasks = set()
+        # (monotonic timestamp, value) memo of the last monitor result
+        self._monitor_cache = (0.0, None)
+
+    CATEGORY_MEMO_MAX = 4096
+
+    def _categorize(self, app_data: str | AppData) -> str:
+        """
+        Returns the category for a monitor snapshot, consulting the
+        in-process memo and then the on-disk store before asking the AI
+        agent. The snapshot is passed through intact — not flattened to a
+        prompt string — so the agent's known-app/host prefilter and URL
+        canonicalization run, and both caches share the agent's
+        normalized key. Categorization is deterministic for a given
+        input, so hits cost one dict lookup (or one indexed SELECT across
+        restarts) instead of an LLM round trip.
+        """
+        key = self.ai_agent._cache_key(app_data)
+        category = self._category_memo.get(key)
+        if category is None:
+            category = self.category_store.get(key)
+            if category is None:
+                category = self.ai_agent.categorize_app(app_data)
+                self.category_store.put(key, category)
+            if len(self._category_memo) >= self.CATEGORY_MEMO_MAX:
+                self._category_memo.clear()
+            self._category_memo[key] = category
+        return category
+
+    def _get_active_window(self):
+        """
+        Polls the monitor through a short TTL cache: back-to-back ticks
+        reuse the last result instead of re-running the platform query
+        (which shells out to AppleScript on macOS).
+        """
+        now = time.monotonic()
+        cached_at, cached_value = self._monitor_cache
+        if cached_value is not None and now - cached_at < self.MONITOR_TTL:
+            return cached_value
+        value = self.monitor.get_active_window()
+        self._monitor_cache = (now, value)
+        return value
+
+    def _get_app_name_for_log(self, app_data):
+        # Plain apps are bare strings used as-is; tab snapshots carry
+        # their display name as a cached property, so nothing is
+        # formatted here
+        if isinstance(app_data, str):
+            return app_data
+        return app_data.app_name_for_log
+
+    async def _send_nudge(self, category: str, duration: float):
+        """
+        Generates the nudge message and shows the notification without
+        blocking the poll loop: both subsystems are I/O-bound, so they run
+        on worker threads while polling continues.
+        """
+        try:
+            message = await asyncio.to_thread(
+                self.ai_agent.generate_nudge, category, duration
             )
-        else:
-            categorization_string = app_data
-            app_name_for_log = app_data
-        return categorization_string, app_name_for_log
+            await asyncio.to_thread(self.notifier.send_notification, "bilge", message)
+        except Exception as e:
+            logger.error(f"Nudge error: {e}")
 
-    def run(self):
+    async def run(self):
         while True:
+            # One clock read per iteration: every use below shares it
+            now = datetime.datetime.now()
+
+            # 1. Continuous monitoring of the active window. The platform
+            # query may shell out, so it runs on a worker thread. Each
+            # external call carries its own narrow guard, so a failing
+            # subsystem is skipped for a tick instead of stalling the loop.
+            current_app_data = None
             try:
-                # 1. Continuous monitoring of the active window
-                current_app_data = self.monitor.get_active_window()
+                current_app_data = await asyncio.to_thread(self._get_active_window)
+            except Exception as e:
+                logger.error(f"Monitor error: {e}")
 
-                if current_app_data:
-                    categorization_string, app_name_for_log = self._get_app_info(
-                        current_app_data
-                    )
-                    current_category = self.ai_agent.categorize_app(
-                        categorization_string
+            if current_app_data:
+                # Fast path: the window is unchanged, so its category is
+                # already known — skip categorization entirely
+                if current_app_data == self.session.app_data:
+                    current_category = self.session.category
+                    # Idle window: poll less often, up to the cap. Rule
+                    # evaluation is unaffected since duration is wallclock.
+                    self._poll_interval = min(
+                        self.MAX_POLL_INTERVAL,
+                        self._poll_interval * self.POLL_BACKOFF,
                     )
+                else:
+                    self._poll_interval = self.MIN_POLL_INTERVAL
+                    app_name_for_log = self._get_app_name_for_log(current_app_data)
+                    try:
+                        current_category = await asyncio.to_thread(
+                            self._categorize, current_app_data
+                        )
+                    except Exception as e:
+                        logger.error(f"Categorization error: {e}")
+                        current_category = "Other"
 
-                    # 2. Check for an app or category switch to end the previous session
-                    if (current_app_data != self.last_app_data) or (
-                        current_category != self.current_session_category
-                    ):
-                        if self.current_session_app_name:
-                            print(
-                                f"{get_date_time()} Session ended. Logging {self.current_session_app_name} | {self.current_session_category}"
+                # 2. Check for an app or category switch to end the previous session
+                if (current_app_data != self.session.app_data) or (
+                    current_category != self.session.category
+                ):
+                    ended = self.session
+                    if ended.app_name:
+                        if VERBOSE:
+                            logger.info(
+                                f"Session ended. Logging {ended.app_name} | {ended.category}"
                             )
+                        try:
                             self.data_manager.save_session(
-                                app_name=self.current_session_app_name,
-                                category=self.current_session_category,
-                                start_time=self.current_session_start_time,
-                                end_time=datetime.datetime.now(),
+                                app_name=ended.app_name,
+                                category=ended.category,
+                                start_time=ended.start_time,
+                                end_time=now,
                             )
+                        except Exception as e:
+                            logger.error(f"Session log error: {e}")
 
-                        # Start a new session
-                        self.current_session_start_time = datetime.datetime.now()
-                        self.current_session_category = current_category
-                        self.current_session_app_name = app_name_for_log
-                        self.last_app_data = current_app_data
-                        print(
-                            f"{get_date_time()} Session started. Tracking {self.current_session_app_name} | {self.current_session_category}"
+                    # Start a new session: one bundle swap, with the
+                    # earliest possible rule trigger precomputed — until
+                    # that deadline passes, evaluation is skipped entirely
+                    start_mono = time.monotonic()
+                    threshold = self.rules_engine.next_trigger_for(current_category)
+                    self.session = Session(
+                        app_name=app_name_for_log,
+                        category=current_category,
+                        start_time=now,
+                        start_mono=start_mono,
+                        app_data=current_app_data,
+                        rule_deadline=(
+                            start_mono + threshold if threshold is not None else None
+                        ),
+                    )
+                    if VERBOSE:
+                        logger.info(
+                            f"Session started. Tracking {self.session.app_name} | {self.session.category}"
                         )
 
-                        # Reset the nudge flag for the new session
-                        self.nudged_for_session = False
-
-                    # 3. Continuous rule evaluation for the CURRENT session
-                    current_session_duration = (
-                        datetime.datetime.now() - self.current_session_start_time
-                    ).total_seconds()
+                # 3. Rule evaluation for the CURRENT session, skipped until
+                # the session is old enough to cross its smallest threshold
+                session = self.session
+                if (
+                    not session.nudged
+                    and session.rule_deadline is not None
+                    and time.monotonic() >= session.rule_deadline
+                ):
+                    current_session_duration = time.monotonic() - session.start_mono
+                    triggered_rule = self.rules_engine.evaluate_current_session(
+                        session.category, current_session_duration
+                    )
 
-                    if not self.nudged_for_session:
-                        triggered_rule = self.rules_engine.evaluate_current_session(
-                            self.current_session_category, current_session_duration
+                    if triggered_rule:
+                        # If a rule is triggered for the first time in this session
+                        rule_name, category, duration = triggered_rule
+                        if VERBOSE:
+                            logger.info(
+                                f"Triggered rule: {rule_name} for category: {category} with duration: {int(duration)} seconds."
+                            )
+                        # Fire the nudge in the background so LLM latency
+                        # never stalls the poll loop, keeping a reference
+                        # until it completes
+                        task = asyncio.create_task(
+                            self._send_nudge(category, duration)
                         )
+                        self._nudge_tasks.add(task)
+                        task.add_done_callback(self._nudge_tasks.discard)
+                        # Set the flag to prevent re-querying for this session
+                        session.nudged = True
 
-                        if triggered_rule:
-                            # If a rule is triggered for the first time in this session
-                            rule_name, category, duration = triggered_rule
-                            print(
-                                f"{get_date_time()} Triggered rule: {rule_name} for category: {category} with duration: {int(duration)} seconds."
-                            )
-                            message = self.ai_agent.generate_nudge(category, duration)
-                            self.notifier.send_notification("bilge", message)
-                            # Set the flag to prevent re-querying for this session
-                            self.nudged_for_session = True
-
-                time.sleep(1)
-
-            except KeyboardInterrupt:
-                print("Exiting from bilge... \n")
-                if self.current_session_app_name:
-                    self.data_manager.save_session(
-                        self.current_session_app_name,
-                        self.current_session_category,
-                        self.current_session_start_time,
-                        datetime.datetime.now(),
-                    )
-                break
-            except Exception as e:
-                print(f"An error occurred: {e}")
-                time.sleep(5)
+            await asyncio.sleep(self._poll_interval)
 
+    def shutdown(self):
+        """
+        Saves the in-flight session on exit.
+        """
+        print("Exiting from bilge... \n")
+        if self.session.app_name:
+            self.data_manager.save_session(
+                self.session.app_name,
+                self.session.category,
+                self.session.start_time,
+                datetime.datetime.now(),
+            )
+        # Drain the buffered session log — saves during the run are plain
+        # buffered writes and only hit disk here or on OS flushes
+        self.data_manager.close()
+        self.category_store.close()
+        self.ai_agent.close()
+
+
+# Shared HTTP session: the keepalive connection is reused across calls
+# instead of paying a TCP handshake each time. Created lazily so runs
+# that never check a model (--help, no model arg) skip the requests
+# import entirely.
+_SESSION = None
+# (monotonic timestamp, model-name set) memo for the Ollama tags endpoint
+_MODEL_CACHE = (0.0, None)
+MODEL_CACHE_TTL = 5.0
+
+
+def _get_ollama_models() -> set | None:
+    """
+    Returns the set of model names known to the local Ollama server, cached
+    for a few seconds so repeated checks don't re-hit the endpoint.
+    Returns None when the server is unreachable.
+    """
+    global _MODEL_CACHE, _SESSION
+    now = time.monotonic()
+    cached_at, models = _MODEL_CACHE
+    if models is not None and now - cached_at < MODEL_CACHE_TTL:
+        return models
 
-def check_ollama_model(model_name: str) -> bool:
     import requests
 
+    if _SESSION is None:
+        _SESSION = requests.Session()
+
     try:
-        response = requests.get("http://localhost:11434/api/tags")
-        if response.status_code == 200:
-            models = response.json().get("models", [])
-            return any(model["name"] == model_name for model in models)
-        return False
+        response = _SESSION.get("http://localhost:11434/api/tags", timeout=2)
+        if response.status_code != 200:
+            return None
+        models = {model["name"] for model in response.json().get("models", [])}
     except requests.RequestException:
-        return False
+        return None
+
+    _MODEL_CACHE = (now, models)
+    return models
+
+
+def check_ollama_model(model_name: str) -> bool:
+    models = _get_ollama_models()
+    return models is not None and model_name in models
 
 
 if __name__ == "__main__":
@@ -155,5 +394,18 @@ if __name__ == "__main__":
             print("Please make sure Ollama is running and the model is pulled.")
             sys.exit(1)
 
+    listener = start_log_listener()
     app = BilgeApp(date, model_name=args.model)
-    app.run()
+    try:
+        asyncio.run(app.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Shutdown runs on every exit path — Ctrl+C or an uncaught
+        # error — so the in-flight session and buffers are never lost.
+        # Then drain queued log records and force the buffered handler's
+        # final flush before the process exits.
+        app.shutdown()
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
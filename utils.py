@@ -1,28 +1,113 @@
-import datetime
+import time
 import subprocess
+from dataclasses import dataclass
+from functools import cached_property
+
+# Whether informational log lines should be produced at all: callers guard
+# their message building on this so silent runs do zero formatting work
+VERBOSE = True
+
+
+# No slots=True: cached_property stores its result in the instance
+# __dict__, which bypasses the frozen __setattr__ guard
+@dataclass(frozen=True)
+class AppData:
+    """
+    Immutable snapshot of a browser tab reported by the monitor.
+
+    Frozen so instances hash and compare as plain value tuples: the poll
+    loop's "did the window change?" check is a single C-level comparison
+    instead of a key-by-key dict walk, and snapshots can be used directly
+    as cache keys.
+    """
+
+    window_name: str
+    active_tab_title: str | None = None
+    active_tab_url: str | None = None
+
+    @cached_property
+    def app_name_for_log(self) -> str:
+        """
+        The display name used in session log lines.
+        """
+        return f"{self.window_name} | {self.active_tab_title}"
+
+# Hoisted format strings so strftime never re-reads a literal per call
+_DATE_FMT = "%Y-%m-%d"
+_DATETIME_FMT = "%Y-%m-%d %H:%M:%S"
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# PyObjC's ScriptingBridge talks to Chrome in-process, skipping the
+# osascript fork/exec and script compile entirely
+try:
+    from ScriptingBridge import SBApplication
+except ImportError:
+    SBApplication = None
+
+import json as _json
+
+
+def json_loads(data):
+    """Parses JSON from a str or bytes, using orjson when available.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return _json.loads(data)
+
+
+def json_dumps(obj, indent=False) -> str:
+    """Serializes an object to a JSON string, using orjson when available.
+    Pass indent=True for human-readable files; the default is compact.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option).decode()
+    if indent:
+        return _json.dumps(obj, indent=2)
+    return _json.dumps(obj, separators=(",", ":"))
 
 
 def get_date():
     """Returns the current date in YYYY-MM-DD format.
     """
-    return datetime.datetime.now().strftime("%Y-%m-%d")
+    # time.strftime formats at C level without a datetime allocation
+    return time.strftime(_DATE_FMT)
 
 def get_date_time():
     """Returns the current date and time in YYYY-MM-DD HH:MM:SS format.
     """
-    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return time.strftime(_DATETIME_FMT)
 
 def debug_applescript_output():
     """Debug function to see raw AppleScript output"""
+    # Preferred path: enumerate windows and tabs directly over the
+    # Scripting Bridge, leaving only the Apple Event cost per access
+    if SBApplication is not None:
+        chrome = SBApplication.applicationWithBundleIdentifier_("com.google.Chrome")
+        if chrome is not None:
+            for w, window in enumerate(chrome.windows(), start=1):
+                print(f"WINDOW:{w}")
+                for tab in window.tabs():
+                    print(f"TAB:{tab.title()}|||{tab.URL()}")
+                print("ENDWINDOW")
+            return
+
+    # Each AppleScript property access is an Apple Event round trip, so the
+    # titles and URLs are fetched with one bulk list accessor per window
+    # instead of two events per tab.
     applescript = '''
     tell application "Google Chrome"
         set output to ""
         repeat with w from 1 to count of windows
             set output to output & "WINDOW:" & w & "\\n"
-            repeat with t from 1 to count of tabs in window w
-                set tabTitle to title of tab t of window w
-                set tabURL to URL of tab t of window w
-                set output to output & "TAB:" & tabTitle & "|||" & tabURL & "\\n"
+            set tabTitles to title of tabs of window w
+            set tabURLs to URL of tabs of window w
+            repeat with i from 1 to count of tabTitles
+                set output to output & "TAB:" & item i of tabTitles & "|||" & item i of tabURLs & "\\n"
             end repeat
             set output to output & "ENDWINDOW\\n"
         end repeat